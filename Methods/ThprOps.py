@@ -1,11 +1,10 @@
+import numpy as np
 from pandas import DataFrame
 
 from typing import Union, Dict, Tuple, List
-from bisect import bisect_left
-from time import time
 
 from Utilities.Exceptions import FeatureNotAvailableError, NoSaturatedStateError, NeedsExtrapolationError
-from Utilities.Numeric import isNumeric, interpolate_1D, isApproximatelyEqual, get_rangeEndpoints, isWithin, get_surroundingValues, to_Kelvin, to_deg_C
+from Utilities.Numeric import isNumeric, isApproximatelyEqual, get_rangeEndpoints, isWithin, get_surroundingValues, get_bracketingGridPoints, to_Kelvin, to_deg_C
 from Utilities.PrgUtilities import LinearEquation
 from Models.States import StatePure, StateIGas
 
@@ -19,21 +18,25 @@ def get_saturationTemperature_atP(mpDF: DataFrame, P: float) -> float:
         # as compressed liquid at temperatures below the critical temperature.
         return mpDF.mp.criticalPoint.T
 
+    elif (cacheKey := ('P', float(P))) in mpDF.mp.saturationValueCache:
+        return mpDF.mp.saturationValueCache[cacheKey]
+
     else:
         # Check if saturated states at provided P are available in the data
-        saturatedStates = mpDF.query('P == {0} and 0 <= x <= 1'.format(P))
+        saturatedRows = mpDF.mp.get_saturatedRows('P', P)
 
-        if not saturatedStates.empty:
+        if saturatedRows.size > 0:
             # Saturated states at P provided in the table
-            saturatedStates_temperatures = saturatedStates['T'].to_list()
-            sample_saturationTemperature = saturatedStates_temperatures[0]
-            assert all(saturationTemperature == sample_saturationTemperature for saturationTemperature in saturatedStates_temperatures), 'ThDataError: Not all saturated states at P = {0} are at the same temperature! - All saturated states are expected to occur at same T & P'.format(P)
-            return sample_saturationTemperature
+            saturatedStates_temperatures = mpDF.mp.get_columnArray('T')[saturatedRows]
+            saturationTemperature = float(saturatedStates_temperatures[0])
+            assert (saturatedStates_temperatures == saturationTemperature).all(), 'ThDataError: Not all saturated states at P = {0} are at the same temperature! - All saturated states are expected to occur at same T & P'.format(P)
 
         else:
             # Saturated state at P not provided directly
-            satLiq_atP = interpolate_onSaturationCurve(mpDF, interpolate_by='P', interpolate_at=P, endpoint='f')
-            return satLiq_atP.T
+            saturationTemperature = interpolate_onSaturationCurve(mpDF, interpolate_by='P', interpolate_at=P, endpoint='f').T
+
+        mpDF.mp.saturationValueCache[cacheKey] = saturationTemperature
+        return saturationTemperature
 
 
 def get_saturationPressure_atT(mpDF: DataFrame, T: float) -> float:
@@ -42,78 +45,87 @@ def get_saturationPressure_atT(mpDF: DataFrame, T: float) -> float:
     if T > mpDF.mp.criticalPoint.T:
         return mpDF.mp.criticalPoint.P
 
+    elif (cacheKey := ('T', float(T))) in mpDF.mp.saturationValueCache:
+        return mpDF.mp.saturationValueCache[cacheKey]
+
     else:
         # Check if saturated states at provided T are available in the data
-        saturatedStates = mpDF.query('T == {0} and 0 <= x <= 1'.format(T))
+        saturatedRows = mpDF.mp.get_saturatedRows('T', T)
 
-        if not saturatedStates.empty:
+        if saturatedRows.size > 0:
             # Saturated states at T provided in the table
-            saturatedStates_pressures = saturatedStates['P'].to_list()
-            sample_saturationPressure = saturatedStates_pressures[0]
-            assert all(saturationPressure == sample_saturationPressure for saturationPressure in saturatedStates_pressures), 'ThDataError: Not all saturated states at T = {0} are at the same pressure! - All saturated states are expected to occur at same T & P'.format(T)
-            return sample_saturationPressure
+            saturatedStates_pressures = mpDF.mp.get_columnArray('P')[saturatedRows]
+            saturationPressure = float(saturatedStates_pressures[0])
+            assert (saturatedStates_pressures == saturationPressure).all(), 'ThDataError: Not all saturated states at T = {0} are at the same pressure! - All saturated states are expected to occur at same T & P'.format(T)
 
         else:
             # Saturated state at T not provided directly
-            satLiq_atT = interpolate_onSaturationCurve(mpDF, interpolate_by='T', interpolate_at=T, endpoint='f')
-            return satLiq_atT.T
+            saturationPressure = interpolate_onSaturationCurve(mpDF, interpolate_by='T', interpolate_at=T, endpoint='f').P
+
+        mpDF.mp.saturationValueCache[cacheKey] = saturationPressure
+        return saturationPressure
 
 
-def get_saturationProperties(materialPropertyDF: DataFrame, P: Union[float, int] = float('nan'), T: Union[float, int] = float('nan')) -> Tuple[StatePure, StatePure]:
-    """Returns saturated liquid and vapor states at the provided pressure or temperature for the material whose materialPropertyDF is provided."""
+def get_saturationProperties(materialPropertyDF: DataFrame, P: Union[float, int] = float('nan'), T: Union[float, int] = float('nan'), endpoint: str = None) -> Tuple[StatePure, StatePure]:
+    """Returns saturated liquid and vapor states at the provided pressure or temperature for the material whose materialPropertyDF is provided.
+    If endpoint is provided ('f' for saturated liquid, 'g' for saturated vapor), only that state is determined and None is returned in place of the other."""
     # at least the T or P must be provided
 
     if isNumeric(P):
 
-        satLiq_atP = materialPropertyDF.query('P == {0} and x == 0'.format(P))
-        if satLiq_atP.empty:
-            # exact state (saturated liquid at P - state denoted "_f") not found
-            satLiq_atP = interpolate_onSaturationCurve(materialPropertyDF, interpolate_by='P', interpolate_at=P, endpoint='f')
-            materialPropertyDF.append(satLiq_atP.get_asDict_allProperties(), ignore_index=True)  # append the calculated (interpolated) state to materialProperty table for future use in runtime if needed - won't have to interpolate again
-        else:
-            # if query found direct match (saturated liquid state at pressure), convert DFRow to a StatePure object
-            satLiq_atP = StatePure().init_fromDFRow(satLiq_atP)
-
-        satVap_atP = materialPropertyDF.query('P == {0} and x == 1'.format(P))
-        if satVap_atP.empty:
-            # exact state (saturated vapor at P - state denoted "_g") not found
-            satVap_atP = interpolate_onSaturationCurve(materialPropertyDF, interpolate_by='P', interpolate_at=P, endpoint='g')
-            materialPropertyDF.append(satVap_atP.get_asDict_allProperties(), ignore_index=True)  # append the calculated (interpolated) state to materialProperty table for future use in runtime if needed - won't have to interpolate again
-        else:
-            # if query found direct match (saturated vapor state at pressure), convert DFRow to a StatePure object
-            satVap_atP = StatePure().init_fromDFRow(satVap_atP)
+        satLiq_atP, satVap_atP = None, None
 
-        assert satLiq_atP.isFullyDefined() and satVap_atP.isFullyDefined()
-        assert satLiq_atP.x == 0 and satVap_atP.x == 1
-        assert satLiq_atP.T == satVap_atP.T
+        if endpoint != 'g':
+            satLiq_atP_rows = materialPropertyDF.mp.get_saturatedRows('P', P, x=0)
+            if satLiq_atP_rows.size == 0:
+                # exact state (saturated liquid at P - state denoted "_f") not found
+                satLiq_atP = interpolate_onSaturationCurve(materialPropertyDF, interpolate_by='P', interpolate_at=P, endpoint='f')
+            else:
+                # if query found direct match (saturated liquid state at pressure), convert table row to a StatePure object
+                satLiq_atP = StatePure().init_fromArrays(materialPropertyDF.cq.columnArrays, satLiq_atP_rows[0])
+            assert satLiq_atP.isFullyDefined() and satLiq_atP.x == 0
+
+        if endpoint != 'f':
+            satVap_atP_rows = materialPropertyDF.mp.get_saturatedRows('P', P, x=1)
+            if satVap_atP_rows.size == 0:
+                # exact state (saturated vapor at P - state denoted "_g") not found
+                satVap_atP = interpolate_onSaturationCurve(materialPropertyDF, interpolate_by='P', interpolate_at=P, endpoint='g')
+            else:
+                # if query found direct match (saturated vapor state at pressure), convert table row to a StatePure object
+                satVap_atP = StatePure().init_fromArrays(materialPropertyDF.cq.columnArrays, satVap_atP_rows[0])
+            assert satVap_atP.isFullyDefined() and satVap_atP.x == 1
+
+        if endpoint is None:
+            assert satLiq_atP.T == satVap_atP.T
 
         if isNumeric(T):
-            assert isWithin(satLiq_atP.T, 3, '%', T), 'InputError: Provided saturation temperature and pressure do not match.'
+            assert isWithin((satVap_atP if endpoint == 'g' else satLiq_atP).T, 3, '%', T), 'InputError: Provided saturation temperature and pressure do not match.'
 
         return satLiq_atP, satVap_atP
 
     elif isNumeric(T):
 
-        satLiq_atT = materialPropertyDF.query('T == {0} and x == 0'.format(T))
-        if satLiq_atT.empty:
-            # exact state (saturated liquid at T - state denoted "_f") not found
-            satLiq_atT = interpolate_onSaturationCurve(materialPropertyDF, interpolate_by='T', interpolate_at=T, endpoint='f')
-            materialPropertyDF.append(satLiq_atT.get_asDict_allProperties(), ignore_index=True)  # append the calculated (interpolated) state to materialProperty table for future use in runtime if needed - won't have to interpolate again
-        else:
-            # if query found direct match (saturated liquid state at pressure), convert DFRow to a StatePure object
-            satLiq_atT = StatePure().init_fromDFRow(satLiq_atT)
-
-        satVap_atT = materialPropertyDF.query('T == {0} and x == 1'.format(T))
-        if satVap_atT.empty:
-            # exact state (saturated vapor at T - state denoted "_g") not found
-            satVap_atT = interpolate_onSaturationCurve(materialPropertyDF, interpolate_by='T', interpolate_at=T, endpoint='g')
-            materialPropertyDF.append(satVap_atT.get_asDict_allProperties(), ignore_index=True)  # append the calculated (interpolated) state to materialProperty table for future use in runtime if needed - won't have to interpolate again
-        else:
-            # if query found direct match (saturated vapor state at pressure), convert DFRow to a StatePure object
-            satVap_atT = StatePure().init_fromDFRow(satVap_atT)
+        satLiq_atT, satVap_atT = None, None
 
-        assert satLiq_atT.isFullyDefined() and satVap_atT.isFullyDefined()
-        assert satLiq_atT.x == 0 and satVap_atT.x == 1
+        if endpoint != 'g':
+            satLiq_atT_rows = materialPropertyDF.mp.get_saturatedRows('T', T, x=0)
+            if satLiq_atT_rows.size == 0:
+                # exact state (saturated liquid at T - state denoted "_f") not found
+                satLiq_atT = interpolate_onSaturationCurve(materialPropertyDF, interpolate_by='T', interpolate_at=T, endpoint='f')
+            else:
+                # if query found direct match (saturated liquid state at temperature), convert table row to a StatePure object
+                satLiq_atT = StatePure().init_fromArrays(materialPropertyDF.cq.columnArrays, satLiq_atT_rows[0])
+            assert satLiq_atT.isFullyDefined() and satLiq_atT.x == 0
+
+        if endpoint != 'f':
+            satVap_atT_rows = materialPropertyDF.mp.get_saturatedRows('T', T, x=1)
+            if satVap_atT_rows.size == 0:
+                # exact state (saturated vapor at T - state denoted "_g") not found
+                satVap_atT = interpolate_onSaturationCurve(materialPropertyDF, interpolate_by='T', interpolate_at=T, endpoint='g')
+            else:
+                # if query found direct match (saturated vapor state at temperature), convert table row to a StatePure object
+                satVap_atT = StatePure().init_fromArrays(materialPropertyDF.cq.columnArrays, satVap_atT_rows[0])
+            assert satVap_atT.isFullyDefined() and satVap_atT.x == 1
 
         return satLiq_atT, satVap_atT
 
@@ -130,11 +142,13 @@ def interpolate_betweenPureStates(pureState_1: StatePure, pureState_2: StatePure
     if mode != 'linear':
         raise FeatureNotAvailableError('Interpolation methods other than "linear"')
     else:
-        x = [getattr(pureState_1, referenceProperty), getattr(pureState_2, referenceProperty)]
+        referenceValue_1, referenceValue_2 = getattr(pureState_1, referenceProperty), getattr(pureState_2, referenceProperty)
+        # Linear interpolation weight is the same for all properties - calculate once, then apply to each property
+        weight = (referenceValue - referenceValue_1) / (referenceValue_2 - referenceValue_1)
 
         for property in pureState_1._properties_all:  # not using reference to general class definition, since state may be StatePure or StateIGas
-            y = [getattr(pureState_1, property), getattr(pureState_2, property)]
-            setattr(interpolatedState, property, interpolate_1D(x, y, referenceValue))
+            value_1 = getattr(pureState_1, property)
+            setattr(interpolatedState, property, value_1 + weight * (getattr(pureState_2, property) - value_1))
 
         return interpolatedState
 
@@ -143,22 +157,28 @@ def interpolate_onSaturationCurve(mpDF: DataFrame, interpolate_by: str, interpol
     """Method to interpolate along the saturation curve. Interpolates to find the state identified by 'endpoint' (either f or g, for saturated liquid or vapor states) (i.e. identifier
     for left or right side of the saturation curve), and by value ('interpolate_at') of the property ('interpolate_by')."""
 
+    # Return a copy of the state if it has been interpolated before - callers may modify the returned state
+    cacheKey = (interpolate_by, float(interpolate_at), endpoint)
+    if cacheKey in mpDF.mp.saturationCache:
+        return StatePure().copy_fromState(mpDF.mp.saturationCache[cacheKey])
+
     endpoint_x = {'f': 0, 'g': 1}
     x = endpoint_x[endpoint]
 
     queryPropt, queryValue = interpolate_by, interpolate_at  # rename for clarity in this method
 
-    satStates_ordered_byPropt = mpDF.query('x == {0}'.format(x)).sort_values(queryPropt)  # retrieve only saturated liquid states
-    satStates_ProptVals = satStates_ordered_byPropt[queryPropt].to_list()
+    satStates_ProptVals, satStates_rows = mpDF.mp.get_saturationCurve(queryPropt, x)  # values of query property at saturated states with quality x, sorted, and their row indices
 
-    proptVal_below, proptVal_above = get_surroundingValues(satStates_ProptVals, queryValue) # satStates_ProptVals[bisect_left(satStates_ProptVals, queryValue) - 1], satStates_ProptVals[bisect_right(satStates_ProptVals, queryValue)]
-    satState_below, satState_above = mpDF.query('x == {0} and {1} == {2}'.format(x, queryPropt, proptVal_below)), mpDF.query('x == {0} and {1} == {2}'.format(x, queryPropt, proptVal_above))
-    assert all(not state_DFrow.empty for state_DFrow in [satState_below, satState_above]), 'More than one saturation state provided for the same value of query property "{0}" in supplied data file.'.format(queryPropt)
+    proptVal_below, proptVal_above = get_surroundingValues(satStates_ProptVals, queryValue, isSorted=True)
+    index_below, index_above = np.searchsorted(satStates_ProptVals, [proptVal_below, proptVal_above], side='left')
+    assert all(np.searchsorted(satStates_ProptVals, proptVal, side='right') - index == 1 for proptVal, index in [(proptVal_below, index_below), (proptVal_above, index_above)]), 'More than one saturation state provided for the same value of query property "{0}" in supplied data file.'.format(queryPropt)
 
-    satState_below, satState_above = StatePure().init_fromDFRow(satState_below), StatePure().init_fromDFRow(satState_above)
+    satState_below, satState_above = StatePure().init_fromArrays(mpDF.cq.columnArrays, satStates_rows[index_below]), StatePure().init_fromArrays(mpDF.cq.columnArrays, satStates_rows[index_above])
 
     satState_atProptVal = interpolate_betweenPureStates(satState_below, satState_above, interpolate_at={queryPropt: queryValue})
     assert satState_atProptVal.isFullyDefined()
+
+    mpDF.mp.saturationCache[cacheKey] = StatePure().copy_fromState(satState_atProptVal)
     return satState_atProptVal
 
 
@@ -167,23 +187,49 @@ def interpolate_inIGasTable(mpDF: DataFrame, interpolate_by: str, interpolate_at
 
     queryPropt, queryValue = interpolate_by, interpolate_at
 
-    exactMatch = mpDF.query('{0} == {1}'.format(queryPropt, queryValue))
+    exactMatch_rows = mpDF.cq.cQueryRows({queryPropt: queryValue})
 
-    if exactMatch.empty:
-        states_ordered_byPropt = mpDF.sort_values(queryPropt)
-        proptVal_below, proptVal_above = get_surroundingValues(states_ordered_byPropt[queryPropt].to_list(), queryValue)
-        state_below = StateIGas().init_fromDFRow( mpDF.query('{0} == {1}'.format(queryPropt, proptVal_below)) )
-        state_above = StateIGas().init_fromDFRow( mpDF.query('{0} == {1}'.format(queryPropt, proptVal_above)) )
+    if exactMatch_rows.size == 0:
+        sortedValues, sortedRows = mpDF.cq.get_sortedColumn(queryPropt)
+        proptVal_below, proptVal_above = get_surroundingValues(sortedValues, queryValue, isSorted=True)
+        # First rows with the surrounding values, as sorting is stable
+        state_below = StateIGas().init_fromArrays(mpDF.cq.columnArrays, sortedRows[np.searchsorted(sortedValues, proptVal_below, side='left')])
+        state_above = StateIGas().init_fromArrays(mpDF.cq.columnArrays, sortedRows[np.searchsorted(sortedValues, proptVal_above, side='left')])
 
         state_atProptVal = interpolate_betweenPureStates(state_below, state_above, interpolate_at={queryPropt: queryValue})
         assert all([state_atProptVal.hasDefined(property) for property in StateIGas._properties_Tdependent])
         return state_atProptVal
 
 
-def fullyDefine_StatePure(state: StatePure, mpDF: DataFrame):
-    """Fully defines StatePure objects by looking them up / interpolating on the material property table."""
+def fullyDefine_StatePure(state: StatePure, mpDF: DataFrame, definitionDecimals: int = None):
+    """Fully defines StatePure objects by looking them up / interpolating on the material property table.
+    States are defined once for each combination of known properties - repeated definitions are served from the cache of the material.
+    If definitionDecimals is provided, states with known properties agreeing to that many decimals share a definition."""
 
     assert state.isFullyDefinable(), 'State not fully definable: need at least 2 (independent) intensive properties to be known.'
+    definitionKey = tuple(state.get_asDict_definedProperties().items())
+
+    if (cachedDefinition := mpDF.mp.get_cachedDefinition(definitionKey, definitionDecimals)) is None:
+        definedState = _fullyDefine_StatePure(state, mpDF)
+        if definedState is None:
+            # Nothing to cache, e.g. saturated states for which neither P nor T is known
+            return definedState
+        # Definition also infers the quality of the provided state - store it to be able to do the same on cache hits
+        mpDF.mp.cache_definition(definitionKey, (StatePure().copy_fromState(definedState), state.x))
+        return definedState
+
+    # Return a copy of the state defined before - callers may modify the returned state
+    cachedState, inferred_x = cachedDefinition
+    if not state.hasDefined('x'):
+        state.x = inferred_x
+    definedState = StatePure().copy_fromState(cachedState)
+    definedState.set(dict(definitionKey))  # keep the known properties as provided - on near hits, those of the cached state differ slightly
+    return definedState
+
+
+def _fullyDefine_StatePure(state: StatePure, mpDF: DataFrame):
+    """Fully defines StatePure objects by looking them up / interpolating on the material property table, without consulting the definition cache."""
+
     availableProperties = state.get_asDict_definedProperties()
     availablePropertiesNames = list(availableProperties.keys())
     non_referencePropertiesNames = [propertyName for propertyName in availablePropertiesNames if propertyName not in ['P', 'T']]
@@ -192,6 +238,7 @@ def fullyDefine_StatePure(state: StatePure, mpDF: DataFrame):
     # DETERMINE PHASE OF SUBSTANCE
 
     isSaturatedMixture = None
+    satLiq_atRef, satVap_atRef = None, None  # saturation states at reference P / T, kept if determined during phase detection to reuse when defining saturated states
 
     # If quality is provided, phase is inferred
     if isNumeric(state.x):
@@ -241,32 +288,36 @@ def fullyDefine_StatePure(state: StatePure, mpDF: DataFrame):
 
                 satLiq_atRef, satVap_atRef = get_saturationProperties(mpDF, P=state.P, T=state.T)
 
-                # Define lambda function to check if value of a non-reference property (i.e. property other than P/T) is within the saturated mixture limits
-                isWithinSaturationZone = lambda propertyName, propertyValue: getattr(satLiq_atRef, propertyName) <= propertyValue <= getattr(satVap_atRef, propertyName)
-                isSuperheated = lambda propertyName, propertyValue: getattr(satVap_atRef, propertyName) < propertyValue
-                isSubcooled = lambda propertyName, propertyValue: propertyValue < getattr(satLiq_atRef, propertyName)
+                # Compare values of all non-reference properties (i.e. properties other than P/T) with the saturated mixture limits at once
+                propertyValues = np.array([getattr(state, propertyName) for propertyName in non_referencePropertiesNames])
+                satLiq_propertyValues = np.array([getattr(satLiq_atRef, propertyName) for propertyName in non_referencePropertiesNames])
+                satVap_propertyValues = np.array([getattr(satVap_atRef, propertyName) for propertyName in non_referencePropertiesNames])
+
+                isWithinSaturationZone = (satLiq_propertyValues <= propertyValues) & (propertyValues <= satVap_propertyValues)
 
                 # Check if the first available non-reference property has value within saturation limits
-                isSaturatedMixture = isWithinSaturationZone(non_referencePropertiesNames[0], getattr(state, non_referencePropertiesNames[0]))
+                isSaturatedMixture = bool(isWithinSaturationZone[0])
 
                 # All non-reference properties should give the same result - if the first one is found to be within saturation limits, all should be so.
-                assert all(isSaturatedMixture == isWithinSaturationZone(propertyName, getattr(state, propertyName)) for propertyName in non_referencePropertiesNames), 'ThDataError: While defining state {0}, property {1} suggests saturated state (value within saturation limits), but other properties do not.'.format(state, non_referencePropertiesNames[0])
+                assert (isWithinSaturationZone == isSaturatedMixture).all(), 'ThDataError: While defining state {0}, property {1} suggests saturated state (value within saturation limits), but other properties do not.'.format(state, non_referencePropertiesNames[0])
                 if isSaturatedMixture:
                     # Calculate state.x using the first available non-reference property
                     calcProptName, calcProptValue = non_referencePropertiesNames[0], availableProperties[non_referencePropertiesNames[0]]
                     state.x = (calcProptValue - getattr(satLiq_atRef, calcProptName))/(getattr(satVap_atRef, calcProptName) - getattr(satLiq_atRef, calcProptName))
 
                 else:
-                    superheated = isSuperheated(non_referencePropertiesNames[0], getattr(state, non_referencePropertiesNames[0]))
+                    isSuperheated = satVap_propertyValues < propertyValues
+                    superheated = bool(isSuperheated[0])
                     # Check if first non-ref propt suggests suph, then assert all other non-ref propts to suggest the same
-                    assert all(superheated == isSuperheated(propertyName, getattr(state, propertyName)) for propertyName in non_referencePropertiesNames), 'ThDataError: While defining state {0}, property {1} suggests superheated state (value above saturation limits), but other properties do not.'.format(state, non_referencePropertiesNames[0])
+                    assert (isSuperheated == superheated).all(), 'ThDataError: While defining state {0}, property {1} suggests superheated state (value above saturation limits), but other properties do not.'.format(state, non_referencePropertiesNames[0])
 
                     if superheated:
                         state.x = 2
                     else:
-                        subcooled = isSubcooled(non_referencePropertiesNames[0], getattr(state, non_referencePropertiesNames[0]))
+                        isSubcooled = propertyValues < satLiq_propertyValues
+                        subcooled = bool(isSubcooled[0])
                         # Check if first non-ref propt suggests subc, then assert all other non-ref propts to suggest the same
-                        assert all(subcooled == isSubcooled(propertyName, getattr(state, propertyName)) for propertyName in non_referencePropertiesNames), 'ThDataError: While defining state {0}, property {1} suggests subcooled state (value below saturation limits), but other properties do not.'.format(state, non_referencePropertiesNames[0])
+                        assert (isSubcooled == subcooled).all(), 'ThDataError: While defining state {0}, property {1} suggests subcooled state (value below saturation limits), but other properties do not.'.format(state, non_referencePropertiesNames[0])
 
                         if subcooled:
                             state.x = -1
@@ -286,13 +337,16 @@ def fullyDefine_StatePure(state: StatePure, mpDF: DataFrame):
     # Fully define state: State is saturated (mixture)
     if isSaturatedMixture:
         if P_available or T_available:
-            satLiq_atP, satVap_atP = get_saturationProperties(mpDF, P=state.P, T=state.T)  # either state.P or state.T has to be known - pass both, it is ok if one is NaN
+            if satLiq_atRef is None:
+                # Saturation states not determined during phase detection - saturated liquid / vapor states need only their own endpoint
+                endpoint = {0: 'f', 1: 'g'}.get(state.x)
+                satLiq_atRef, satVap_atRef = get_saturationProperties(mpDF, P=state.P, T=state.T, endpoint=endpoint)  # either state.P or state.T has to be known - pass both, it is ok if one is NaN
             if state.x == 0:
-                return satLiq_atP
+                return satLiq_atRef
             elif state.x == 1:
-                return satVap_atP
+                return satVap_atRef
             else:  # saturated mixture with unique quality (not 0 or 1)
-                return interpolate_betweenPureStates(satLiq_atP, satVap_atP, interpolate_at={'x': state.x})
+                return interpolate_betweenPureStates(satLiq_atRef, satVap_atRef, interpolate_at={'x': state.x})
         else:
             # Define saturated state with properties other than P/T
             pass
@@ -315,11 +369,11 @@ def fullyDefine_StatePure(state: StatePure, mpDF: DataFrame):
         refPropts = [(refPropt1_name, refPropt1_queryValue), (refPropt2_name, refPropt2_queryValue)]
 
         # Check if exact state available
-        exactState = mpDF.cq.cQuery({refPropt1_name: refPropt1_queryValue, refPropt2_name: refPropt2_queryValue})
+        exactState_rows = mpDF.cq.cQueryRows({refPropt1_name: refPropt1_queryValue, refPropt2_name: refPropt2_queryValue})
 
-        if not exactState.empty:
-            if len(exactState.index) == 1:
-                return StatePure().init_fromDFRow(exactState)
+        if exactState_rows.size != 0:
+            if exactState_rows.size == 1:
+                return StatePure().init_fromArrays(mpDF.cq.columnArrays, exactState_rows[0])
             else:
                 # Found multiple states with same P & T - need to pick one
                 # TODO - Pick one
@@ -333,13 +387,13 @@ def fullyDefine_StatePure(state: StatePure, mpDF: DataFrame):
             # Check if either refPropt1_queryValue or refPropt2_queryValue has data available
             for refProptCurrent_index, (refProptCurrent_name, refProptCurrent_queryValue) in enumerate(refPropts):
 
-                states_at_refProptCurrent = phase_mpDF.cq.cQuery({refProptCurrent_name: refProptCurrent_queryValue})
+                rows_at_refProptCurrent = phase_mpDF.cq.cQueryRows({refProptCurrent_name: refProptCurrent_queryValue})
 
-                if not states_at_refProptCurrent.empty and len(states_at_refProptCurrent.index) > 1:  # there should be more than one state at refProptCurrent to interpolate between
+                if rows_at_refProptCurrent.size > 1:  # there should be more than one state at refProptCurrent to interpolate between
                     # If so, get refProptOther and its interpolation gap (gap between available values)
 
                     refProptOther_name, refProptOther_queryValue = refPropts[refProptCurrent_index - 1]
-                    values_of_refProptOther = states_at_refProptCurrent[refProptOther_name].to_list()
+                    values_of_refProptOther = phase_mpDF.cq.columnArrays[refProptOther_name][rows_at_refProptCurrent]
 
                     try:
                         refProptOther_valueBelow, refProptOther_valueAbove = get_surroundingValues(values_of_refProptOther, refProptOther_queryValue)
@@ -378,59 +432,34 @@ def fullyDefine_StatePure(state: StatePure, mpDF: DataFrame):
                 refProptOther_queryValue = availableProperties[refProptOther_name]
                 refProptOther_valueBelow, refProptOther_valueAbove = _1d_interpolationCheck[refPropt_name]['refProptOther']['surroundingValues']
 
-                state_with_refProptOther_valueBelow = StatePure().init_fromDFRow(phase_mpDF.cq.cQuery({refPropt_name: refPropt_value,
-                                                                                                       refProptOther_name: refProptOther_valueBelow}))
-
-                state_with_refProptOther_valueAbove = StatePure().init_fromDFRow(phase_mpDF.cq.cQuery({refPropt_name: refPropt_value,
-                                                                                                       refProptOther_name: refProptOther_valueAbove}))
+                state_with_refProptOther_valueBelow = StatePure().init_fromArrays(phase_mpDF.cq.columnArrays, phase_mpDF.cq.cQueryRow(refPropt_name, refPropt_value, refProptOther_name, refProptOther_valueBelow))
+                state_with_refProptOther_valueAbove = StatePure().init_fromArrays(phase_mpDF.cq.columnArrays, phase_mpDF.cq.cQueryRow(refPropt_name, refPropt_value, refProptOther_name, refProptOther_valueAbove))
 
                 return interpolate_betweenPureStates(state_with_refProptOther_valueBelow, state_with_refProptOther_valueAbove, interpolate_at={refProptOther_name: refProptOther_queryValue})
 
             else:
                 # DOUBLE INTERPOLATION
-                available_refProptPairs = list(phase_mpDF[[refPropt1_name, refPropt2_name]].itertuples(index=False, name=None))
 
                 # refPropt1 -> x, refPropt2 -> y
-
-                xVals = sorted(set(pair[0] for pair in available_refProptPairs))
-                xVals_available_yVals = {xVal: set(pair[1] for pair in available_refProptPairs if pair[0] == xVal) for xVal in xVals}
-
-                xVals_less = xVals[: (index := bisect_left(xVals, refPropt1_queryValue))]  # list of available xValues less than query value available in states
-                xVals_more = xVals[index:]  # same for available xValues more than query value
-
-                # Iterate over values of x surrounding the queryValue of x (= refPropt1_queryValue)
-                t1 = time()
+                xVals, xVals_yValOffsets, yVals = phase_mpDF.cq.get_gridIndex(refPropt1_name, refPropt2_name)
 
                 # Strategy: First find 2 states:
                 # one with x value less than refPropt1_queryValue but with y value = refPropt2_queryValue
                 # one with x value more than refPropt1_queryValue but with y value = refPropt2_queryValue
                 # i.e. two states surround the requested state in terms of x.
-                # To find these 2 states, iterate over available xValues more than and less than the x query value. At each iteration, TRY to get the 2 surrounding values of y available for that x.
-                # There may not be 2 values of y available at each x value surrounding the queried y value. In such case, try/except clause continues iteration with a new x value.
+                # To find these 2 states, get_bracketingGridPoints walks over available xValues less than and more than the x query value. At each xValue, it tries to find the 2 surrounding values of y
+                # available for that x. There may not be 2 values of y available at each x value surrounding the queried y value. In such case, the search continues with a new x value.
                 # Once at an x value, 2 values of y surrounding the y query value are found, interpolate between the states with (xVal, yVal_below) and (xVal, yVal_above)
-                # The outmost for loop does this for both state with x value less than x query value and state with x value more than x query value.
 
                 states_at_y_queryValue = []  # list of states at which y = refPropt2 value is the query value, but x = refPropt1 value is not the query value.
 
-                for available_xValList in [reversed(xVals_less), xVals_more]:
-
-                    for xVal in available_xValList:
-                        xVal_available_yVals = xVals_available_yVals[xVal]
+                for xVal, yVal_below, yVal_above in get_bracketingGridPoints(xVals, xVals_yValOffsets, yVals, refPropt1_queryValue, refPropt2_queryValue):
+                    state_at_xVal_yVal_below = StatePure().init_fromArrays(phase_mpDF.cq.columnArrays, phase_mpDF.cq.cQueryRow(refPropt1_name, xVal, refPropt2_name, yVal_below))
+                    state_at_xVal_yVal_above = StatePure().init_fromArrays(phase_mpDF.cq.columnArrays, phase_mpDF.cq.cQueryRow(refPropt1_name, xVal, refPropt2_name, yVal_above))
 
-                        try:
-                            yVal_below, yVal_above = get_surroundingValues(xVal_available_yVals, refPropt2_queryValue)
-                        except NeedsExtrapolationError:
-                            continue
-
-                        state_at_xVal_less_yVal_below = StatePure().init_fromDFRow(phase_mpDF.cq.cQuery({refPropt1_name: xVal, refPropt2_name: yVal_below}))
-                        state_at_xVal_less_yVal_above = StatePure().init_fromDFRow(phase_mpDF.cq.cQuery({refPropt1_name: xVal, refPropt2_name: yVal_above}))
-
-                        states_at_y_queryValue.append(interpolate_betweenPureStates(state_at_xVal_less_yVal_below, state_at_xVal_less_yVal_above, interpolate_at={refPropt2_name: refPropt2_queryValue}))
-                        break
+                    states_at_y_queryValue.append(interpolate_betweenPureStates(state_at_xVal_yVal_below, state_at_xVal_yVal_above, interpolate_at={refPropt2_name: refPropt2_queryValue}))
 
                 if len(states_at_y_queryValue) == 2:
-                    t2 = time()
-                    print('TimeNotification: 2DInterpolation - Time to iteratively find smallest suitable interpolation interval: {0} seconds'.format((t2 - t1) / 1000))
                     return interpolate_betweenPureStates(states_at_y_queryValue[0], states_at_y_queryValue[1], interpolate_at={refPropt1_name: refPropt1_queryValue})
                 else:
                     # 2 states to interpolate between could not be found
@@ -438,7 +467,7 @@ def fullyDefine_StatePure(state: StatePure, mpDF: DataFrame):
                     if state.x == -1 and T_available and P_available:
                         # SATURATED LIQUID APPROXIMATION AT SAME TEMPERATURE FOR SUBCOOLED LIQUIDS
                         print('ThPrNotification: Applying saturated liquid approximation for subcooled liquid state.')
-                        satLiq_atT = get_saturationProperties(mpDF, T=state.T)[0]  # returns [satLiq, satVap], pick first
+                        satLiq_atT = get_saturationProperties(mpDF, T=state.T, endpoint='f')[0]  # returns [satLiq, None], pick first
                         # should provide full mpDF and not phase_mpDF - if phase is subcooled, won't find saturated states (x=0) in its phase_mpDF
 
                         toReturn = satLiq_atT
@@ -453,10 +482,13 @@ def apply_IGasLaw(state: StateIGas, R: float):
     """Uses Ideal Gas Law to find missing properties, if possible. If all variables in the Ideal Gas Law are already defined, checks consistency"""
     # P mu = R T
     IGasLaw_allProperties = ['P', 'mu', 'T']
-    IGasLaw_availableProperties = [propertyName for propertyName in IGasLaw_allProperties if isNumeric(getattr(state, propertyName))]
-    IGasLaw_missingProperties = [propertyName for propertyName in IGasLaw_allProperties if propertyName not in IGasLaw_availableProperties]
+    IGasLaw_missingProperties = []
+    for propertyName in IGasLaw_allProperties:
+        if not isNumeric(getattr(state, propertyName)):
+            IGasLaw_missingProperties.append(propertyName)
 
-    if (number_ofMissingProperties := len(IGasLaw_missingProperties)) == 1:
+    number_ofMissingProperties = len(IGasLaw_missingProperties)
+    if number_ofMissingProperties == 1:
         assert state.isFullyDefinable()
         missingProperty = IGasLaw_missingProperties[0]
         if missingProperty == 'P':
@@ -472,8 +504,38 @@ def apply_IGasLaw(state: StateIGas, R: float):
         print(str.format('apply_IGasLaw: Insufficient data - cannot apply law to find missing properties {0}', IGasLaw_missingProperties))
 
 
+def apply_IGasLaw_toArrays(P: np.ndarray, mu: np.ndarray, T: np.ndarray, R: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns P, mu and T arrays with values missing (NaN) in one of the three filled in using the ideal gas law, P * mu = R * T, where the other two are available.
+    Works on arrays to evaluate many states at once - same relations as in apply_IGasLaw, but values available for all three are not checked for consistency."""
+    P, mu, T = np.array(P, dtype=float), np.array(mu, dtype=float), np.array(T, dtype=float)
+    P_missing, mu_missing, T_missing = np.isnan(P), np.isnan(mu), np.isnan(T)
+
+    # Fill in values only where exactly that value is missing, using values available before filling in
+    P_new = np.where(P_missing & ~mu_missing & ~T_missing, R * to_Kelvin(T) / mu, P)
+    mu_new = np.where(mu_missing & ~P_missing & ~T_missing, R * to_Kelvin(T) / P, mu)
+    T_new = np.where(T_missing & ~P_missing & ~mu_missing, to_deg_C(P * mu / R), T)
+    return P_new, mu_new, T_new
+
+
 def fullyDefine_StateIGas(state: StateIGas, fluid: 'IdealGas') -> StateIGas:
-    """Tries to fill in the properties of an ideal gas state by applying the ideal gas law and looking up state on the provided mpDF."""
+    """Tries to fill in the properties of an ideal gas state by applying the ideal gas law and looking up state on the provided mpDF.
+    States are defined once for each combination of known properties and gas constant - repeated definitions are filled in from the cache of the material.
+    States with known properties agreeing to the fluid's definitionDecimals, if set, share a definition."""
+    knownProperties = state.get_asDict_definedProperties()
+    definitionKey = (('R', fluid.R),) + tuple(knownProperties.items())
+
+    if (cachedState := fluid.mpDF.mp.get_cachedDefinition(definitionKey, fluid.definitionDecimals)) is None:
+        _fullyDefine_StateIGas(state, fluid)
+        fluid.mpDF.mp.cache_definition(definitionKey, StateIGas().copy_fromState(state))
+        return state
+
+    state.copy_fromState(cachedState)
+    state.set(knownProperties)  # keep the known properties as provided - on near hits, those of the cached state differ slightly
+    return state
+
+
+def _fullyDefine_StateIGas(state: StateIGas, fluid: 'IdealGas') -> StateIGas:
+    """Tries to fill in the properties of an ideal gas state by applying the ideal gas law and looking up state on the provided mpDF, without consulting the definition cache."""
     apply_IGasLaw(state, fluid.R)
 
     # Do an ideal gas table look-up after applying ideal gas law above. The process above may first determine T and only then this table look-up can be done.
@@ -481,9 +543,9 @@ def fullyDefine_StateIGas(state: StateIGas, fluid: 'IdealGas') -> StateIGas:
     if len(available_TDependentProperties := [propertyName for propertyName in StateIGas._properties_Tdependent if state.hasDefined(propertyName)]) >= 1:
         # Get tabulated T-dependent properties
         refPropt_name = available_TDependentProperties[0]
-        state_at_refPropt = fluid.mpDF.cq.cQuery({refPropt_name: getattr(state, refPropt_name)})  # Try finding exact state on mpDF
+        rows_at_refPropt = fluid.mpDF.cq.cQueryRows({refPropt_name: getattr(state, refPropt_name)})  # Try finding exact state on mpDF
 
-        if state_at_refPropt.empty:
+        if rows_at_refPropt.size == 0:
             try:
                 # Interpolate in mpDF - ideal gas properties table
                 interpolatedState = interpolate_inIGasTable(mpDF=fluid.mpDF, interpolate_by=refPropt_name, interpolate_at=getattr(state, refPropt_name))
@@ -492,7 +554,8 @@ def fullyDefine_StateIGas(state: StateIGas, fluid: 'IdealGas') -> StateIGas:
                 print('fullyDefine_StateIGas: Extrapolation needed to find state at {0}={1}'.format(refPropt_name, getattr(state, refPropt_name)))
                 pass
         else:
-            state.init_fromDFRow(state_at_refPropt)  # Found exact match, initialize from DFRow
+            assert rows_at_refPropt.size == 1
+            state.init_fromArrays(fluid.mpDF.cq.columnArrays, rows_at_refPropt[0])  # Found exact match, initialize from table row
 
     # In case the table look-up determines T from another T-dependent property, can use ideal gas law to figure out P or mu if they were unknown
     # TODO: Try ideal gas law again only if changes have been made
@@ -516,10 +579,13 @@ def apply_isentropicIGasProcess(constant_c: bool, state_in: StateIGas, state_out
 
     if constant_c:  # Analysis with constant specific heats, c
 
+        # Exponents of the isentropic relations between T and P, T2/T1 = (P2/P1)^((k-1)/k) and P2/P1 = (T2/T1)^(k/(k-1))
+        exponent_TP, exponent_PT = (fluid.k - 1)/fluid.k, fluid.k/(fluid.k - 1)
+
         if all(T_defined):  # T1 and T2 known
 
             if all(P_defined) and all(mu_defined):  # P1 & P2 and mu1 & mu2 are all known, verify
-                assert (to_Kelvin(state_2.T) / to_Kelvin(state_1.T)) == (state_2.P / state_1.P)**((fluid.k - 1)/fluid.k), str.format('apply_isentropicIGasProcess: constant c analysis - In-out states fully defined, isentropic process relation does not hold between states\n{0}\n{1}', state_1, state_2)
+                assert (to_Kelvin(state_2.T) / to_Kelvin(state_1.T)) == (state_2.P / state_1.P)**exponent_TP, str.format('apply_isentropicIGasProcess: constant c analysis - In-out states fully defined, isentropic process relation does not hold between states\n{0}\n{1}', state_1, state_2)
 
             elif not any(P_defined) or not any(mu_defined):  # None among P1 & P2 and mu1 & mu2 are known - cannot do anything
                 print(str.format('apply_isentropicIGasProcess: constant c analysis - Insufficient data, cannot apply relation between states\n{0}\n{1}', state_1, state_2))
@@ -534,10 +600,10 @@ def apply_isentropicIGasProcess(constant_c: bool, state_in: StateIGas, state_out
                 assert any(P_defined)  # either P1 or P2 should be available now
 
                 if P_defined[0]:  # P1 is defined, P2 is to be found
-                    state_2.P = ( (state_1.P)**((fluid.k - 1)/fluid.k) * (to_Kelvin(state_2.T) / to_Kelvin(state_1.T)) ) ** (fluid.k/(fluid.k - 1))
+                    state_2.P = ( (state_1.P)**exponent_TP * (to_Kelvin(state_2.T) / to_Kelvin(state_1.T)) ) ** exponent_PT
                     apply_IGasLaw(state_2, fluid.R)
                 else:  # P2 is defined, P1 is to be found
-                    state_1.P = ( (state_2.P)**((fluid.k - 1)/fluid.k) * (to_Kelvin(state_1.T) / to_Kelvin(state_2.T)) ) ** (fluid.k/(fluid.k - 1))
+                    state_1.P = ( (state_2.P)**exponent_TP * (to_Kelvin(state_1.T) / to_Kelvin(state_2.T)) ) ** exponent_PT
                     apply_IGasLaw(state_1, fluid.R)
 
         elif all(P_defined):  # but now all(T_defined), would have otherwise entered first if block
@@ -554,11 +620,11 @@ def apply_isentropicIGasProcess(constant_c: bool, state_in: StateIGas, state_out
                 assert any(T_defined)
 
                 if T_defined[0]:  # T1 known, find T2
-                    state_2.T = to_deg_C( to_Kelvin(state_1.T) * (state_2.P / state_1.P)**((fluid.k - 1)/fluid.k) )
+                    state_2.T = to_deg_C( to_Kelvin(state_1.T) * (state_2.P / state_1.P)**exponent_TP )
                     # state_2.mu = float('nan')  # reset mu - needs to be recalculated - assuming T & P correct
                     apply_IGasLaw(state_2, fluid.R)
                 else:  # T2 known, find T1
-                    state_1.T = to_deg_C( to_Kelvin(state_2.T) / (state_2.P / state_1.P)**((fluid.k - 1)/fluid.k) )
+                    state_1.T = to_deg_C( to_Kelvin(state_2.T) / (state_2.P / state_1.P)**exponent_TP )
                     # state_1.mu = float('nan')  # reset mu - needs to be recalculated - assuming T & P correct
                     apply_IGasLaw(state_1, fluid.R)
 
@@ -624,26 +690,28 @@ def apply_isentropicEfficiency(constant_c: bool, state_in: StatePure, state_out_
         if state_out_ideal.hasDefined('P'):
 
             if fluid.stateClass is StatePure:  # if not an IGas flow - ideally should check if fluid is IGas but cannot as ThprOps do not know fluids.
-                state_out_ideal.set_or_verify({'s': state_in.s})
-                try:
-                    state_out_ideal.copy_fromState(fluid.define(state_out_ideal))
-                except NeedsExtrapolationError:
-                    # For pumps dealing with subcooled liquids no data may be available. w = mu*dP relation can be used to get at least the h.
-                    if all(state.x <= 0 for state in [state_in, state_out_ideal]):
-                        apply_incompressibleWorkRelation(state_in=state_in, state_out=state_out_ideal)
-
-            assert all(state.hasDefined('h') for state in [state_in, state_out_ideal])  # state_in & state_out should have *h* defined
+                if not state_out_ideal.hasDefined('s'):
+                    state_out_ideal.s = state_in.s
+                else:
+                    assert isWithin(state_out_ideal.s, 3, '%', state_in.s)
+                if not state_out_ideal.isFullyDefined():  # state_out_ideal may have been fully defined already, e.g. in a previous iteration
+                    try:
+                        state_out_ideal.copy_fromState(fluid.define(state_out_ideal))
+                    except NeedsExtrapolationError:
+                        # For pumps dealing with subcooled liquids no data may be available. w = mu*dP relation can be used to get at least the h.
+                        if all(state.x <= 0 for state in [state_in, state_out_ideal]):
+                            apply_incompressibleWorkRelation(state_in=state_in, state_out=state_out_ideal)
+
+            assert state_in.hasDefined('h') and state_out_ideal.hasDefined('h')  # state_in & state_out should have *h* defined
             work_ideal = state_out_ideal.h - state_in.h
 
+            if (eta_isentropic == 1 or work_ideal == 0) and state_out_ideal.isFullyDefined():
+                # Actual process is the ideal process, state_out_ideal is already the actual outlet state - return a copy, no need to define the actual state again
+                return fluid.stateClass().copy_fromState(state_out_ideal)
+
             state_out_actual = fluid.stateClass(P=state_out_ideal.P)
 
-            if work_ideal >= 0:  # work provided to flow from device -> eta_s = w_ideal / w_actual
-                work_actual = work_ideal / eta_isentropic
-                state_out_actual.h = work_actual + state_in.h
-            elif work_ideal < 0:  # work extracted from flow by device -> eta_s = w_actual / w_ideal
-                work_ideal = abs(work_ideal)
-                work_actual = eta_isentropic * work_ideal
-                state_out_actual.h = state_in.h - work_actual
+            state_out_actual.h = state_in.h + get_actualWork(work_ideal, eta_isentropic)
 
             return fluid.defineState_ifDefinable(state_out_actual)
 
@@ -654,18 +722,30 @@ def apply_isentropicEfficiency(constant_c: bool, state_in: StatePure, state_out_
             state_out_actual = fluid.stateClass()
             state_out_actual.copy_fromState(state_out_ideal)  # accessing __class__ like this, to use the same class as state_out - could be StatePure or StateIGas
 
-            if work_ideal >= 0:
-                work_actual = work_ideal / eta_isentropic
-                state_out_actual.T = (work_actual/fluid.cp) + state_in.T
-                state_out_actual.mu = float('nan')  # mu of state_out_ideal no longer valid, needs to be recalculated with IGasLaw
-            elif work_ideal <= 0:
-                work_ideal = abs(work_ideal)
-                work_actual = eta_isentropic * work_ideal
-                state_out_actual.T = state_in.T - (work_actual/fluid.cp)
+            if isNumeric(work_ideal):
+                state_out_actual.T = state_in.T + (get_actualWork(work_ideal, eta_isentropic)/fluid.cp)
                 state_out_actual.mu = float('nan')  # mu of state_out_ideal no longer valid, needs to be recalculated with IGasLaw
             return state_out_actual
 
 
+def get_actualWork(work_ideal: float, eta_isentropic: float) -> float:
+    """Returns the actual work of a process with the provided ideal (isentropic) work and isentropic efficiency. Positive work is provided to the flow, negative work is extracted from it."""
+    # work provided to flow from device -> eta_s = w_ideal / w_actual, work extracted from flow by device -> eta_s = w_actual / w_ideal
+    return work_ideal / eta_isentropic if work_ideal >= 0 else work_ideal * eta_isentropic
+
+
+def apply_isentropicEfficiency_toEnthalpies(h_in: np.ndarray, h_out_ideal: np.ndarray, eta_isentropic: Union[float, np.ndarray], dtype: type = np.float64) -> np.ndarray:
+    """Returns the actual outlet enthalpies of processes with the provided inlet and ideal (isentropic) outlet enthalpies and isentropic efficiencies.
+    Works on arrays to evaluate many processes at once, e.g. in parametric studies - same relations as in apply_isentropicEfficiency for variable c analysis.
+    Calculations are made in the provided dtype - np.float32 halves the memory of large sweeps where ~7 significant digits are sufficient, e.g. in early iterations of optimizers."""
+    h_in, h_out_ideal, eta_isentropic = np.asarray(h_in, dtype=dtype), np.asarray(h_out_ideal, dtype=dtype), np.asarray(eta_isentropic, dtype=dtype)
+    work_ideal = h_out_ideal - h_in
+
+    # work provided to flow from device -> eta_s = w_ideal / w_actual, work extracted from flow by device -> eta_s = w_actual / w_ideal
+    work_actual = np.where(work_ideal >= 0, work_ideal / eta_isentropic, work_ideal * eta_isentropic)
+    return h_in + work_actual
+
+
 def apply_incompressibleWorkRelation(state_in: StatePure, state_out: StatePure):
     """Applies the steady flow **reversible** work relation for incompressible states. (h2 - h1 = mu * (P2 - P1))"""
     endStates = [state_in, state_out]
@@ -681,6 +761,26 @@ def apply_incompressibleWorkRelation(state_in: StatePure, state_out: StatePure):
         for state in [state for state in endStates if state is not sampleState_with_mu]:
             state.set_or_verify({'mu': sampleState_with_mu.mu})
 
+    # With mu known, the relation has a closed form solution for whichever one of the other properties is unknown - solve directly instead of constructing the equation
+    if len(states_with_mu) > 0:
+        mu = sampleState_with_mu.mu
+        unknowns = [(state, propertyName) for state in endStates for propertyName in ['h', 'P'] if not state.hasDefined(propertyName)]
+        if len(unknowns) == 1:
+            unknownState, unknownProperty = unknowns[0]
+            if unknownProperty == 'h':
+                work = mu * (state_out.P - state_in.P)
+                if unknownState is state_out:
+                    state_out.h = state_in.h + work
+                else:
+                    state_in.h = state_out.h - work
+            else:
+                pressureDifference = (state_out.h - state_in.h) / mu
+                if unknownState is state_out:
+                    state_out.P = state_in.P + pressureDifference
+                else:
+                    state_in.P = state_out.P - pressureDifference
+            return True
+
     workRelation = LinearEquation(LHS=[ ( (state_out, 'mu'), (state_out, 'P') ), (-1, (state_in, 'mu'), (state_in, 'P')), (-1, (state_out, 'h')), (1, (state_in, 'h')) ], RHS=0)
     if workRelation.isSolvable():
         workRelation.solve_and_set()
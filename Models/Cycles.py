@@ -114,17 +114,18 @@ class Cycle:
 
         updateEquations(self._equations, self._updatedUnknowns)
         updatedUnknowns = solve_solvableEquations(self._equations)
-        self._updatedUnknowns.union(updatedUnknowns)
+        self._updatedUnknowns.update(updatedUnknowns)
 
-        updateEquations(self._equations, self._updatedUnknowns)
+        # Equations need updating only for unknowns solved in the previous step - updateEquations does nothing if none were solved
+        updateEquations(self._equations, updatedUnknowns)
         updatedUnknowns = solve_combination_ofEquations(self._equations, number_ofEquations=2)
-        self._updatedUnknowns.union(updatedUnknowns)
+        self._updatedUnknowns.update(updatedUnknowns)
 
-        updateEquations(self._equations, self._updatedUnknowns)
+        updateEquations(self._equations, updatedUnknowns)
         updatedUnknowns = solve_combination_ofEquations(self._equations, number_ofEquations=3)
-        self._updatedUnknowns.union(updatedUnknowns)
+        self._updatedUnknowns.update(updatedUnknowns)
 
-        updateEquations(self._equations, self._updatedUnknowns)
+        updateEquations(self._equations, updatedUnknowns)
 
 
     def _convertStates_toFlowPoints(self):
@@ -135,9 +136,10 @@ class Cycle:
         for flow in self.flows:
             flowPointClass = flowPointClasses[flow.workingFluid.__class__]  # To create the appropriate FlowPoint based on type of fluid
 
-            for state in flow.states:
-                # Replace state with flow point - find the position of the state in the items list, change item at index (i.e. state)
-                flow.items[flow.items.index(state)] = flowPointClass(baseState=state, flow=flow)
+            for itemIndex, item in enumerate(flow.items):
+                if isinstance(item, StatePure):
+                    # Replace state with flow point - change item at its position in the items list
+                    flow.items[itemIndex] = flowPointClass(baseState=item, flow=flow)
 
     def get_deviceDict(self) -> Dict:
         deviceDict = {}
@@ -151,7 +153,7 @@ class Cycle:
 
     def _get_intersections(self):
         """Iterates through flows' items to find intersections. Specifically, checks for shared endpoints and devices."""
-        endPoints = []
+        endPoints = set()
         intersections = set()
 
         # Identify end connections - DEVICES
@@ -159,17 +161,17 @@ class Cycle:
             for endPoint in [flow.items[0], flow.items[-1]]:
                 if isinstance(endPoint, Device):  # endPoint may be a state or a device! - pick devices
                     if endPoint not in endPoints:
-                        endPoints.append(endPoint)
+                        endPoints.add(endPoint)
                     else:
                         # this endPoint of this flow is already registered as an endPoint, likely by some other flow,
                         # or by the same flow in the previous iteration of the inner for loop in case of a cyclic flow.
                         intersections.add(endPoint)
 
         # Identify crossover points - DEVICES
-        for flow, otherFlow in combinations(self.flows, 2):
-            flow_itemSet, otherFlow_itemSet = set(item for item in flow.items[1:-1] if isinstance(item, Device)), set(item for item in otherFlow.items[1:-1] if isinstance(item, Device))
-            # [1:-1] not to include endPoints, as their intersections are covered by above process
-            intersections.update(item for item in flow_itemSet.intersection(otherFlow_itemSet) if isinstance(item, Device))  # add *devices* encountered in both flows
+        # [1:-1] not to include endPoints, as their intersections are covered by above process
+        flow_deviceSets = [frozenset(item for item in flow.items[1:-1] if isinstance(item, Device)) for flow in self.flows]
+        for flow_deviceSet, otherFlow_deviceSet in combinations(flow_deviceSets, 2):
+            intersections.update(flow_deviceSet & otherFlow_deviceSet)  # add devices encountered in both flows
 
         return intersections
 
@@ -86,8 +86,7 @@ class Flow:
         """Returns a list of items before and after the provided item in the flow items list.
         If includeNone, if there is no surrounding value from one side, a None value is added in its place to the returned list."""
         surroundingItems = []
-        if item in self.items:
-            itemIndex = self.items.index(item)
+        if (itemIndex := self._get_itemIndex(item)) is not None:
             if itemIndex > 0:  # item is not the first item in items list, there is at least one more item before it
                 surroundingItems.append(self.items[itemIndex - 1])
             elif includeNone:
@@ -100,9 +99,18 @@ class Flow:
 
     def get_itemRelative(self, item, relativePosition: int):
         """Returns the flow item given by its position relative to the specified item. relativePosition of -1 returns the flow item prior to the provided item."""
-        itemIndex = self.items.index(item)
+        itemIndex = self._get_itemIndex(item)
+        assert itemIndex is not None, 'Item {0} is not in the items of flow {1}.'.format(item, self)
         return self.items[itemIndex + relativePosition]
 
+    def _get_itemIndex(self, item: Union[StatePure, Device]) -> Union[int, None]:
+        """Returns the position of the item in the flow items list, or None if the item is not in the flow. Items are matched by identity - comparing by value would compare all properties of states
+        and could match a different state with the same property values."""
+        for itemIndex, flowItem in enumerate(self.items):
+            if flowItem is item:
+                return itemIndex
+        return None
+
     def solve(self):
         self._define_definableStates()
 
@@ -8,19 +8,22 @@ from Utilities.Exceptions import NeedsExtrapolationError
 
 class Fluid:
 
-    def __init__(self, mpDF: DataFrame, k: float = float('nan'), cp: float = float('nan')):
+    def __init__(self, mpDF: DataFrame, k: float = float('nan'), cp: float = float('nan'), definitionDecimals: int = None):
 
         self.mpDF = mpDF
         self.defFcn = fullyDefine_StatePure
 
+        # If set, states with known properties agreeing to this many decimals share a definition
+        self.definitionDecimals = definitionDecimals
+
         self.k = k
         self.cp = cp
 
         self.stateClass = StatePure  # States of this fluid should be StatePure objects
 
     def define(self, state: StatePure):
-        """Wrapper around the state definition function to directly include the fluid's mpDF."""
-        return self.defFcn(state, self.mpDF)
+        """Wrapper around the state definition function to directly include the fluid's mpDF and definitionDecimals."""
+        return self.defFcn(state, self.mpDF, self.definitionDecimals)
 
     def defineState_ifDefinable(self, state: StatePure):
         if not state.isFullyDefined() and state.isFullyDefinable():
@@ -33,9 +36,9 @@ class Fluid:
 
 class IdealGas(Fluid):
 
-    def __init__(self, mpDF: DataFrame, R: float, k: float = float('nan'), cp: float = float('nan')):
+    def __init__(self, mpDF: DataFrame, R: float, k: float = float('nan'), cp: float = float('nan'), definitionDecimals: int = None):
 
-        super(IdealGas, self).__init__(mpDF, k, cp)
+        super(IdealGas, self).__init__(mpDF, k, cp, definitionDecimals)
         self.defFcn = fullyDefine_StateIGas
         self.R = R
 
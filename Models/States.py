@@ -1,26 +1,39 @@
+import numpy as np
 from pandas import DataFrame
 
 from collections import OrderedDict
-from dataclasses import dataclass, field
 from typing import Union, Dict, List
 
 from Utilities.Numeric import isNumeric, isWithin
 
 
-@dataclass  # TODO: Not hashing as intended. Instances with identical content have same hash.
 class StatePure:
-    P: float = float('nan')
-    T: float = float('nan')
-    mu: float = float('nan')
-    h: float = float('nan')
-    u: float = float('nan')
-    s: float = float('nan')
-    x: float = float('nan')
+
+    # Fields are stored in slots instead of a per-instance __dict__ - states are created in large numbers during state definitions and cycle solutions.
+    # Not a dataclass, as dataclass fields with default values cannot be slots. __init__, __repr__ and __eq__ below follow what the dataclass generated.
+    __slots__ = ('P', 'T', 'mu', 'h', 'u', 's', 'x')
 
     _properties_regular = ['P', 'T', 'mu', 'h', 'u', 's']  # ordered in preference to use in interpolation
     _properties_mixture = ['x']
     _properties_all = _properties_regular + _properties_mixture
 
+    def __init__(self, P: float = float('nan'), T: float = float('nan'), mu: float = float('nan'), h: float = float('nan'), u: float = float('nan'), s: float = float('nan'), x: float = float('nan')):
+        self.P = P
+        self.T = T
+        self.mu = mu
+        self.h = h
+        self.u = u
+        self.s = s
+        self.x = x
+
+    def __repr__(self):
+        return '{0}(P={1!r}, T={2!r}, mu={3!r}, h={4!r}, u={5!r}, s={6!r}, x={7!r})'.format(self.__class__.__qualname__, self.P, self.T, self.mu, self.h, self.u, self.s, self.x)
+
+    def __eq__(self, other):
+        if other.__class__ is self.__class__:
+            return (self.P, self.T, self.mu, self.h, self.u, self.s, self.x) == (other.P, other.T, other.mu, other.h, other.u, other.s, other.x)
+        return NotImplemented
+
     def __hash__(self):
         # In previous versions, we had unsafe_hash = True in dataclass decorator. This generated a __hash__ method based on the __eq__ method.
         # Two equal but non-identical states therefore had the same hash, and therefore caused problems in dictionary keys, observed in LinearEquations.
@@ -85,6 +98,19 @@ class StatePure:
             print('Initialized state ' + str(self) + ' from DFRow, properties ' + str(missingProperties_inDFRow) + ' not provided in DataFrame row.')
         return self
 
+    def init_fromArrays(self, columnArrays: Dict, rowIndex: int):
+        """Sets property attributes of the StatePure using values at the provided positional row index of the column arrays, which map column names to NumPy arrays.
+        Avoids constructing a DataFrame row for each state initialized from a table."""
+        missingProperties_inArrays = []
+        for propertyName in self._properties_all:
+            if propertyName in columnArrays:
+                setattr(self, propertyName, float(columnArrays[propertyName][rowIndex]))
+            else:
+                missingProperties_inArrays.append(propertyName)
+        if missingProperties_inArrays != []:
+            print('Initialized state ' + str(self) + ' from arrays, properties ' + str(missingProperties_inArrays) + ' not provided in column arrays.')
+        return self
+
     def init_fromDict(self, dictionary: Dict):
         """Sets property attributes of the StatePure using values provided in the dictionary."""
         for propertyName in dictionary.keys():
@@ -145,12 +171,8 @@ class StateIGas(StatePure):
 
     # In addition to properties of StatePure
 
-    # Properties for variable-c analysis
-    s0: float = float('nan')
-    P_r: float = float('nan')
-    mu_r: float = float('nan')
-
-    x: int = 2  # superheated vapor / gas
+    # Properties for variable-c analysis - stored in slots like the properties of StatePure
+    __slots__ = ('s0', 'P_r', 'mu_r')
 
     _properties_regular = ['T', 'P', 'mu', 'h', 'u']  # ordered in preference to use in interpolation
     _properties_variable_c = ['P_r', 'mu_r', 's0']  # T-dependent properties used in analysis with variable specific heats
@@ -158,6 +180,12 @@ class StateIGas(StatePure):
 
     _properties_Tdependent = ['T', 'P_r', 'mu_r', 'h', 'u', 's0']
 
+    def __init__(self, P: float = float('nan'), T: float = float('nan'), mu: float = float('nan'), h: float = float('nan'), u: float = float('nan'), s: float = float('nan'), x: float = float('nan')):
+        super().__init__(P=P, T=T, mu=mu, h=h, u=u, s=s, x=x)
+        self.s0 = float('nan')
+        self.P_r = float('nan')
+        self.mu_r = float('nan')
+
     def __repr__(self):
         return 'StateIGas(P:{0}, T:{1}, mu:{2}, h:{3}, u:{4}, P_r:{5}, mu_r:{6}, s0:{7})'.format(self.P, self.T, self.mu, self.h, self.u, self.P_r, self.mu_r, self.s0)
 
@@ -399,4 +427,15 @@ class FlowPoint_IGas(StateIGas):
 
         for parameterName in setDict:
             if parameterName in self._properties_all:
-                setattr(self, parameterName, setDict[parameterName])
\ No newline at end of file
+                setattr(self, parameterName, setDict[parameterName])
+
+
+def get_statesArray(states: List[StatePure], propertyNames: List[str] = None) -> np.ndarray:
+    """Returns a structured NumPy array with a row for each of the provided states and a float field for each property (all properties of the first state if propertyNames not provided).
+    Property values of many states are then laid out contiguously by property, e.g. statesArray['h'], for array operations over the states."""
+    if propertyNames is None:
+        propertyNames = states[0]._properties_all
+    statesArray = np.empty(len(states), dtype=[(propertyName, float) for propertyName in propertyNames])
+    for propertyName in propertyNames:
+        statesArray[propertyName] = [getattr(state, propertyName) for state in states]
+    return statesArray
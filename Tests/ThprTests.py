@@ -1,13 +1,16 @@
 import unittest
+import numpy as np
 
 from typing import Dict, Union
 
-from Models.States import StatePure, StateIGas
+from Models.States import StatePure, StateIGas, get_statesArray
 from Models.Fluids import Fluid, IdealGas
-from Methods.ThprOps import fullyDefine_StatePure, fullyDefine_StateIGas, apply_isentropicIGasProcess
+from Methods.ThprOps import fullyDefine_StatePure, fullyDefine_StateIGas, apply_isentropicIGasProcess, apply_isentropicEfficiency, apply_isentropicEfficiency_toEnthalpies, apply_IGasLaw, apply_IGasLaw_toArrays, get_saturationPressure_atT
 
 from Utilities.FileOps import read_Excel_DF, process_MaterialPropertyDF
-from Utilities.Numeric import isWithin
+from Utilities.Exceptions import NeedsExtrapolationError
+from Utilities.Numeric import isWithin, get_surroundingValues
+from Utilities.PrgUtilities import LRUCache, LinearEquation
 
 dataFile_path = r'Cengel_Formatted_Unified.xlsx'
 dataFile_worksheet = 'WaterUnified'
@@ -523,6 +526,55 @@ class TestStateDefineMethods_Water(unittest.TestCase):
         s6_h_alt = 479.59
         self.assertTrue(isWithin(s6.h, 3, '%', s6_h_alt))
 
+    def test_definitionCache_01(self):
+        # Repeated definitions with the same known properties should give equal but separate states
+
+        state1 = StatePure(P=3000, T=450)
+        state1 = fullyDefine_StatePure(state1, water_mpDF)
+        state2 = StatePure(P=3000, T=450)
+        state2 = fullyDefine_StatePure(state2, water_mpDF)
+
+        self.assertIsNot(state1, state2)
+        self.assertEqual(state1.get_asDict_allProperties(), state2.get_asDict_allProperties())
+
+        state2.h = 0
+        state3 = fullyDefine_StatePure(StatePure(P=3000, T=450), water_mpDF)
+        self.assertEqual(state1.h, state3.h)
+
+    def test_definitionCache_02(self):
+        # With definitionDecimals set, states with known properties agreeing to that many decimals should share a definition
+
+        water = Fluid(water_mpDF, definitionDecimals=3)
+        state1 = water.define(StatePure(P=3000, T=450))
+        state2 = water.define(StatePure(P=3000.0001, T=450))
+        state3 = water.define(StatePure(P=3010, T=450))
+
+        self.assertEqual(state1.h, state2.h)
+        self.assertEqual(state2.P, 3000.0001)  # known properties are kept as provided
+        self.assertNotEqual(state1.h, state3.h)
+
+        # Definitions made before the fluid, without definitionDecimals, are shared by near states as well
+        state4 = fullyDefine_StatePure(StatePure(P=2000, T=400), water_mpDF)
+        state5 = Fluid(water_mpDF, definitionDecimals=2).define(StatePure(P=2000.004, T=400.001))
+        self.assertEqual(state4.s, state5.s)
+        self.assertEqual((state5.P, state5.T), (2000.004, 400.001))
+
+        # Definitions without definitionDecimals remain exact
+        self.assertIsNone(water_mpDF.mp.get_cachedDefinition((('P', 3000.0002), ('T', 450))))
+
+    def test_definitionCache_03(self):
+        # Saturated states with neither P nor T known are not defined - nothing should be cached for them
+
+        self.assertIsNone(fullyDefine_StatePure(StatePure(x=0.5, h=2000), water_mpDF))
+        self.assertIsNone(fullyDefine_StatePure(StatePure(x=0.5, h=2000), water_mpDF))
+
+    def test_saturationPressure_01(self):
+        # Saturation pressure at a temperature not in the table should be interpolated between the surrounding saturated states - at T = 25 & 28.96 in the table
+
+        expected_P = 3.1698 + (27.5 - 25) / (28.96 - 25) * (4.0 - 3.1698)
+        self.assertAlmostEqual(get_saturationPressure_atT(water_mpDF, 27.5), expected_P)
+        self.assertAlmostEqual(get_saturationPressure_atT(water_mpDF, 27.5), expected_P)  # from saturationValueCache
+
 
 class TestStateDefineMethods_R134a(unittest.TestCase):
 
@@ -582,6 +634,18 @@ class TestStateDefineMethods_Air(unittest.TestCase):
         s3 = fullyDefine_StateIGas(StateIGas(P=6435, T=(2046.35 - 273.15)), air)
         self.CompareResults(s3, {'mu': 0.09126}, 3)
 
+    def test_definitionCache_01(self):
+        # Repeated definitions should be served from the definition cache, until it is cleared
+
+        definitionKey = (('R', air.R), ('T', 35), ('P', 120))
+        s1 = fullyDefine_StateIGas(StateIGas(P=120, T=35), air)
+        self.assertIn(definitionKey, air_mpDF.mp.definitionCache)
+
+        air_mpDF.mp.clear_definitionCache()
+        self.assertNotIn(definitionKey, air_mpDF.mp.definitionCache)
+        s2 = fullyDefine_StateIGas(StateIGas(P=120, T=35), air)
+        self.assertEqual(s1.get_asDict_allProperties(), s2.get_asDict_allProperties())
+
 
 class TestIGasIsentropicRelations(unittest.TestCase):
 
@@ -628,7 +692,73 @@ class TestIGasIsentropicRelations(unittest.TestCase):
         self.CompareResults(s4, {'T': 781.05-273}, 3)
 
 
+class TestIsentropicEfficiency(unittest.TestCase):
+
+    def test_water_01(self):
+        # Turbine and pump processes evaluated at once should give the same outlet enthalpies as evaluated one by one
+
+        water = Fluid(water_mpDF)
+        states_in = [fullyDefine_StatePure(StatePure(P=3000, T=450), water_mpDF), fullyDefine_StatePure(StatePure(P=10, x=0), water_mpDF)]
+        states_out_ideal = [StatePure(P=10), StatePure(P=3000)]
+        etas = [0.85, 0.8]
+
+        states_out_actual = [apply_isentropicEfficiency(constant_c=False, state_in=state_in, state_out_ideal=state_out_ideal, eta_isentropic=eta, fluid=water)
+                             for state_in, state_out_ideal, eta in zip(states_in, states_out_ideal, etas)]
+
+        h_out_actual = apply_isentropicEfficiency_toEnthalpies(get_statesArray(states_in)['h'], get_statesArray(states_out_ideal, ['h'])['h'], etas)
+        for state_out_actual, h in zip(states_out_actual, h_out_actual):
+            self.assertAlmostEqual(state_out_actual.h, h)
+
+
+class TestIGasLaw(unittest.TestCase):
+
+    def test_air_01(self):
+        # States evaluated at once should have the same missing properties filled in as when evaluated one by one
+
+        states = [StateIGas(mu=0.8, T=27), StateIGas(P=500, T=400), StateIGas(P=100, mu=0.9)]
+        statesArray = get_statesArray(states, ['P', 'mu', 'T'])
+        P, mu, T = apply_IGasLaw_toArrays(statesArray['P'], statesArray['mu'], statesArray['T'], air.R)
+
+        for index, state in enumerate(states):
+            apply_IGasLaw(state, air.R)
+            self.assertAlmostEqual(state.P, P[index])
+            self.assertAlmostEqual(state.mu, mu[index])
+            self.assertAlmostEqual(state.T, T[index])
+
+
+class TestSurroundingValues(unittest.TestCase):
+
+    def test_01(self):
+        # Unsorted lists, arrays and other iterables such as sets should give the same surrounding values
+
+        values = [40, 10, 30, 20]
+        for dataList in [values, np.array(values), set(values)]:
+            self.assertEqual(get_surroundingValues(dataList, 25), (20, 30))
+        self.assertRaises(NeedsExtrapolationError, get_surroundingValues, set(values), 5)
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_01(self):
+        # Once maxsize is exceeded, the least recently used item should be dropped
+
+        cache = LRUCache(maxsize=2)
+        cache['a'], cache['b'] = 1, 2
+        self.assertEqual(cache['a'], 1)
+        cache['c'] = 3
+        self.assertEqual(list(cache.keys()), ['a', 'c'])
+        self.assertIsNone(cache.get('b'))
+
 
+class TestLinearEquation(unittest.TestCase):
 
+    def test_isSatisfied_01(self):
+        # Equations whose terms have all become known should be checked against their remaining RHS
 
+        state = StatePure(P=100, T=50)
+        equation = LinearEquation(LHS=[(2, (state, 'P')), (-4, (state, 'T'))], RHS=0)
+        self.assertEqual(equation.get_unknowns(), [])
+        self.assertTrue(equation.isSatisfied())
 
+        equation = LinearEquation(LHS=[(2, (state, 'P')), (-3, (state, 'T'))], RHS=0)
+        self.assertFalse(equation.isSatisfied())
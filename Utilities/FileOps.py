@@ -1,9 +1,12 @@
+import numpy as np
+
 from pandas import read_excel, DataFrame
 from pandas.api.extensions import register_dataframe_accessor
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Tuple
 
 from Models.States import StatePure
-from Utilities.Numeric import isNumeric
+from Utilities.Numeric import isNumeric, get_gridIndex
+from Utilities.PrgUtilities import LRUCache
 
 
 def read_Excel_DF(filepath: str, worksheet: Union[str, int] = None, indexColumn: int = None, headerRow: int = None, skipRows: List = None, squeeze: bool = False):
@@ -24,6 +27,27 @@ class MaterialPropertyAccessor:
 
     def __init__(self, mpDF: DataFrame):
         self._mpDF = mpDF
+
+        # Look-up structures built lazily on first use. pandas keeps the accessor object on the DataFrame, so these are built once per material.
+        self._saturationIndex = {}
+        self._saturationCurves = {}
+
+        # Caches of results computed at runtime are bounded - they are keyed on the raw values provided, and solver / optimizer sweeps over continuous inputs add an entry at nearly every call
+
+        # Saturation states interpolated at runtime, keyed by (interpolate_by, interpolate_at, endpoint) - e.g. ('P', 10, 'f') - so that each is interpolated only once
+        self.saturationCache = LRUCache(maxsize=4096)
+
+        # Saturation temperatures / pressures, keyed by the property and value they are at - e.g. ('P', 10) for the saturation temperature at P = 10
+        self.saturationValueCache = LRUCache(maxsize=4096)
+
+        # Fully defined states, keyed by the known properties they were defined with - e.g. (('P', 10), ('x', 0)) - along with the quality inferred for the provided state.
+        # Ideal gas states are keyed by the gas constant and the known properties, e.g. (('R', 0.287), ('T', 300), ('P', 100))
+        self.definitionCache = LRUCache(maxsize=4096)
+
+        # Definitions keyed by the known properties rounded to a number of decimals, for each number of decimals requested - e.g. {3: {(('P', 10.0), ('x', 0.0)): ...}}
+        # States whose known properties agree when rounded share a definition, e.g. near-duplicate states evaluated by optimizers. Each is bounded as the definition cache.
+        self._nearDefinitionCaches = {}
+
         self._determine_criticalPointProperties()
 
     def _determine_criticalPointProperties(self):
@@ -31,11 +55,11 @@ class MaterialPropertyAccessor:
         # This assumption will return very inaccurate critical point properties if users provide data of states significantly below critical point properties
 
         if 'x' in self.availableProperties:
-            saturatedStates = self._mpDF.query('0 <= x <= 1')
-            maximumTemperature = saturatedStates['T'].max()
-            criticalPointCandidates = saturatedStates.query('T == {0}'.format(maximumTemperature))
-            if not criticalPointCandidates.empty:
-                self.criticalPoint = StatePure().init_fromDFRow(criticalPointCandidates.head(1))
+            qualities, temperatures = self.get_columnArray('x'), self.get_columnArray('T')
+            saturatedRows = np.flatnonzero((0 <= qualities) & (qualities <= 1) & ~np.isnan(temperatures))
+            if saturatedRows.size > 0:
+                criticalPointRow = saturatedRows[np.argmax(temperatures[saturatedRows])]  # first saturated state with the maximum temperature
+                self.criticalPoint = StatePure().init_fromArrays(self._mpDF.cq.columnArrays, criticalPointRow)
             else:
                 print('ThDataError: No state found when looking for the saturated state with the maximum temperature. Are there any saturated states provided in the data?')
 
@@ -43,6 +67,72 @@ class MaterialPropertyAccessor:
     def availableProperties(self):
         return list(self._mpDF.columns)
 
+    def get_cachedDefinition(self, definitionKey: Tuple, definitionDecimals: int = None):
+        """Returns the definition cached for the known properties in the definitionKey, or None if not cached. If definitionDecimals is provided and the exact known properties are not found,
+        returns the definition cached for known properties with the same values rounded to definitionDecimals, if any."""
+        if (definition := self.definitionCache.get(definitionKey)) is None and definitionDecimals is not None:
+            definition = self._get_nearDefinitionCache(definitionDecimals).get(self._get_nearDefinitionKey(definitionKey, definitionDecimals))
+        return definition
+
+    def cache_definition(self, definitionKey: Tuple, definition):
+        """Caches the definition for the known properties in the definitionKey, also by their rounded values for each number of decimals near definitions were requested with."""
+        self.definitionCache[definitionKey] = definition
+        for definitionDecimals, nearDefinitionCache in self._nearDefinitionCaches.items():
+            if (nearDefinitionKey := self._get_nearDefinitionKey(definitionKey, definitionDecimals)) not in nearDefinitionCache:
+                nearDefinitionCache[nearDefinitionKey] = definition
+
+    def clear_definitionCache(self):
+        """Drops all cached definitions, e.g. after the material property data is modified. The definitions are kept per material and shared by all fluids using it."""
+        self.definitionCache.clear()
+        self._nearDefinitionCaches.clear()
+
+    def _get_nearDefinitionCache(self, definitionDecimals: int) -> LRUCache:
+        """Returns the definitions keyed by known properties rounded to definitionDecimals. Built from the definitions in the (bounded) definition cache on first request, kept updated by cache_definition afterwards."""
+        if definitionDecimals not in self._nearDefinitionCaches:
+            nearDefinitionCache = LRUCache(maxsize=self.definitionCache.maxsize)
+            for definitionKey, definition in self.definitionCache.items():
+                if (nearDefinitionKey := self._get_nearDefinitionKey(definitionKey, definitionDecimals)) not in nearDefinitionCache:
+                    nearDefinitionCache[nearDefinitionKey] = definition
+            self._nearDefinitionCaches[definitionDecimals] = nearDefinitionCache
+        return self._nearDefinitionCaches[definitionDecimals]
+
+    @staticmethod
+    def _get_nearDefinitionKey(definitionKey: Tuple, definitionDecimals: int) -> Tuple:
+        return tuple((propertyName, round(value, definitionDecimals)) for propertyName, value in definitionKey)
+
+    def get_columnArray(self, columnName: str) -> np.ndarray:
+        """Returns the values of the column as a float NumPy array. The arrays are extracted from the DataFrame once, and shared with the cq accessor."""
+        return self._mpDF.cq.columnArrays[columnName]
+
+    def get_saturatedRows(self, propertyName: str, value: float, x: float = None) -> np.ndarray:
+        """Returns positional row indices of the saturated states (0 <= x <= 1) at which the property (P or T) has exactly the provided value, in table order.
+        If x is provided, only the saturated states with that quality are returned, e.g. x=0 for saturated liquid states."""
+        if x is not None:
+            # Saturated states with quality x are indexed separately, sorted by the property
+            sortedValues, sortedRows = self.get_saturationCurve(propertyName, x)
+            return sortedRows[np.searchsorted(sortedValues, value, side='left'): np.searchsorted(sortedValues, value, side='right')]
+
+        if propertyName not in self._saturationIndex:
+            # Saturated states sorted by the property, so that states at a value can be found by binary search instead of scanning the table
+            qualities = self.get_columnArray('x')
+            saturatedRows = np.flatnonzero((0 <= qualities) & (qualities <= 1))
+            propertyValues = self.get_columnArray(propertyName)[saturatedRows]
+            sortingOrder = np.argsort(propertyValues, kind='stable')
+            self._saturationIndex[propertyName] = (propertyValues[sortingOrder], saturatedRows[sortingOrder])
+
+        sortedValues, sortedRows = self._saturationIndex[propertyName]
+        return sortedRows[np.searchsorted(sortedValues, value, side='left'): np.searchsorted(sortedValues, value, side='right')]
+
+    def get_saturationCurve(self, propertyName: str, x: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the values of the property at the saturated states with quality x (0 for saturated liquid, 1 for saturated vapor states) sorted in ascending order,
+        along with the positional row indices of these states in the same order."""
+        if (curveKey := (x, propertyName)) not in self._saturationCurves:
+            rows = np.flatnonzero(self.get_columnArray('x') == x)
+            propertyValues = self.get_columnArray(propertyName)[rows]
+            sortingOrder = np.argsort(propertyValues, kind='stable')
+            self._saturationCurves[curveKey] = (propertyValues[sortingOrder], rows[sortingOrder])
+        return self._saturationCurves[curveKey]
+
 
 @register_dataframe_accessor('cq')
 class CustomQueryAccessor:
@@ -50,15 +140,62 @@ class CustomQueryAccessor:
     def __init__(self, mpDF: DataFrame):
         self._mpDF = mpDF
 
+        # Phase sections of the mpDF and look-up structures on them, built lazily on first use
+        self._phaseDFs = {}
+        self._pairIndex = {}
+        self._gridIndex = {}
+        self._sortedColumns = {}
+        self._columnArrays = None
+
     @property
     def suphVaps(self) -> DataFrame:
         """Returns superheated vapor states, identified by a quality of 2."""
-        return self._mpDF.query('x == 2')
+        if 'suphVaps' not in self._phaseDFs:
+            self._phaseDFs['suphVaps'] = self._mpDF[self.columnArrays['x'] == 2]
+        return self._phaseDFs['suphVaps']
 
     @property
     def subcLiqs(self) -> DataFrame:
         """Returns subcooled liquid states, identified by a quality of -1."""
-        return self._mpDF.query('x == -1')
+        if 'subcLiqs' not in self._phaseDFs:
+            self._phaseDFs['subcLiqs'] = self._mpDF[self.columnArrays['x'] == -1]
+        return self._phaseDFs['subcLiqs']
+
+    @property
+    def columnArrays(self) -> Dict[str, np.ndarray]:
+        """Returns dictionary mapping names of the numeric columns to their values as float NumPy arrays, built once per DataFrame."""
+        if self._columnArrays is None:
+            self._columnArrays = {columnName: self._mpDF[columnName].to_numpy(dtype=float) for columnName in self._mpDF.select_dtypes('number').columns}
+        return self._columnArrays
+
+    def get_gridIndex(self, propertyName_x: str, propertyName_y: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the grid index (see Numeric.get_gridIndex) of the values of the 2 properties available in the DataFrame, built once per pair of property names."""
+        if (pairKey := (propertyName_x, propertyName_y)) not in self._gridIndex:
+            self._gridIndex[pairKey] = get_gridIndex(self.columnArrays[propertyName_x], self.columnArrays[propertyName_y])
+        return self._gridIndex[pairKey]
+
+    def get_sortedColumn(self, propertyName: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the values of the property in ascending order, along with the positional row indices of these values in the same order. Built once per property name."""
+        if propertyName not in self._sortedColumns:
+            sortingOrder = np.argsort(self.columnArrays[propertyName], kind='stable')
+            self._sortedColumns[propertyName] = (self.columnArrays[propertyName][sortingOrder], sortingOrder)
+        return self._sortedColumns[propertyName]
+
+    def cQueryRows(self, conditions: Dict) -> np.ndarray:
+        """Returns positional indices of the rows in which the columns have exactly the provided values. Unlike cQuery, compares the cached column arrays directly
+        instead of formatting and parsing a query string."""
+        rowsMask = np.ones(len(self._mpDF.index), dtype=bool)
+        for columnName, columnValue in conditions.items():
+            rowsMask &= (self.columnArrays[columnName] == columnValue)
+        return np.flatnonzero(rowsMask)
+
+    def cQueryRow(self, propertyName_1: str, value_1: float, propertyName_2: str, value_2: float) -> Union[int, None]:
+        """Returns the positional index of the row with the exact provided values of the 2 properties, or None if there is no such row.
+        Uses a dictionary mapping value pairs to row indices, built once per pair of property names."""
+        if (pairKey := (propertyName_1, propertyName_2)) not in self._pairIndex:
+            self._pairIndex[pairKey] = {(rowValue_1, rowValue_2): rowIndex for rowIndex, (rowValue_1, rowValue_2)
+                                        in enumerate(zip(self.columnArrays[propertyName_1].tolist(), self.columnArrays[propertyName_2].tolist()))}
+        return self._pairIndex[pairKey].get((value_1, value_2))
 
     def cQuery(self, conditions: Dict) -> DataFrame:
         """Custom query method - wrapper around the regular DataFrame.query for convenience."""
@@ -1,7 +1,8 @@
+import numpy as np
+
 from math import isnan
-from typing import Union, Tuple, List
+from typing import Union, Tuple, List, Set
 from bisect import bisect_left, bisect_right
-from time import time
 
 from Utilities.Exceptions import NeedsExtrapolationError
 
@@ -9,18 +10,25 @@ def isNumeric(value):
     return not isnan(value)
 
 
-def get_surroundingValues(dataList: List, value: Union[float, int]) -> Tuple:
+def get_surroundingValues(dataList: Union[List, Set, np.ndarray], value: Union[float, int], isSorted: bool = False) -> Tuple:
+    """Returns the values in dataList just below and just above the provided value. If isSorted, dataList is expected to be sorted in ascending order already and is not sorted again."""
+
+    if not isSorted:
+        if isinstance(dataList, (np.ndarray, list)):
+            dataList = np.sort(np.asarray(dataList, dtype=float))
+        else:
+            # Other iterables, e.g. sets, cannot be converted to arrays directly
+            dataList = sorted(dataList)
 
-    dataList = sorted(dataList)
-    valueBelow = dataList[bisect_left(dataList, value) - 1]
-    if valueBelow > value:
+    index_below = np.searchsorted(dataList, value, side='left') - 1
+    if index_below < 0:
         raise NeedsExtrapolationError('valueBelow could not be found')
 
-    try:
-        valueAbove = dataList[bisect_right(dataList, value)]
-    except IndexError:
+    index_above = np.searchsorted(dataList, value, side='right')
+    if index_above >= len(dataList):
         raise NeedsExtrapolationError('valueAbove could not be found.')
 
+    valueBelow, valueAbove = float(dataList[index_below]), float(dataList[index_above])
     assert valueBelow <= value <= valueAbove
     return valueBelow, valueAbove
 
@@ -75,7 +83,6 @@ def get_doubleInterpolationRectangle(pairs: List[Tuple], refPropt1_name, refProp
     minimumDiagonal_surroundingValues = {}
 
     # Iterate over values of x surrounding the queryValue of x (= refPropt1_queryValue)
-    t1 = time()
     for xVal_less in reversed(xVals_less):  # reversed -> gradually move away (left) from the x queryValue
 
         for xVal_more in xVals_more:  # gradually move away (right) from the x queryValue
@@ -102,12 +109,45 @@ def get_doubleInterpolationRectangle(pairs: List[Tuple], refPropt1_name, refProp
                 minimumDiagonal = diagonal
                 minimumDiagonal_surroundingValues.update({refPropt1_name: (xVal_less, xVal_more), refPropt2_name: (yVal_below, yVal_above)})
 
-    t2 = time()
-    print('TimeNotification: 2DInterpolation - Time to iteratively find smallest suitable interpolation interval: {0} seconds'.format((t2 - t1) / 1000))
-
     return minimumDiagonal_surroundingValues
 
 
+def get_gridIndex(xValues: np.ndarray, yValues: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Organizes scattered (x, y) points into a compressed grid. Returns the sorted unique x values, offsets, and the y values sorted within each x.
+    y values available at xVals[i] are yVals[offsets[i]: offsets[i + 1]]. Points with a NaN coordinate are left out."""
+    definedPoints = ~(np.isnan(xValues) | np.isnan(yValues))
+    xValues, yValues = xValues[definedPoints], yValues[definedPoints]
+
+    sortingOrder = np.lexsort((yValues, xValues))  # sort by x, then by y within same x
+    xValues, yVals = xValues[sortingOrder], yValues[sortingOrder]
+    xVals, xVals_startIndices = np.unique(xValues, return_index=True)
+    offsets = np.append(xVals_startIndices, len(xValues))
+    return xVals, offsets, yVals
+
+
+def get_bracketingGridPoints(xVals: np.ndarray, offsets: np.ndarray, yVals: np.ndarray, xQueryValue: float, yQueryValue: float) -> List[Tuple[float, float, float]]:
+    """Searches the grid from get_gridIndex for the x values closest to xQueryValue, one below and one at/above it, at which y values surrounding yQueryValue are available.
+    Returns a list of (xVal, yVal_below, yVal_above) tuples, one for each side where such an x value is found - first for the side below xQueryValue."""
+    bracketingPoints = []
+    index = int(np.searchsorted(xVals, xQueryValue, side='left'))
+
+    # Walk away from the x query value, first to the left (x values less than query value), then to the right (x values more than or equal to query value)
+    for xIndices in [range(index - 1, -1, -1), range(index, len(xVals))]:
+        for xIndex in xIndices:
+            xVal_available_yVals = yVals[offsets[xIndex]: offsets[xIndex + 1]]
+
+            # Same surrounding values as get_surroundingValues, i.e. strictly below and strictly above the query value
+            index_below = np.searchsorted(xVal_available_yVals, yQueryValue, side='left') - 1
+            index_above = np.searchsorted(xVal_available_yVals, yQueryValue, side='right')
+            if index_below < 0 or index_above >= len(xVal_available_yVals):
+                continue  # y values available at this x value do not surround the y query value
+
+            bracketingPoints.append((float(xVals[xIndex]), float(xVal_available_yVals[index_below]), float(xVal_available_yVals[index_above])))
+            break
+
+    return bracketingPoints
+
+
 def to_Kelvin(oValue: Union[float, int], oUnit: str = 'deg_C'):
     return oValue + 273.15
 
@@ -1,10 +1,10 @@
 import numpy as np
 
-from collections import UserList
+from collections import UserList, OrderedDict
 from typing import List, Iterable, Callable, Dict, Set
 from itertools import combinations
 
-from Utilities.Numeric import isNumeric
+from Utilities.Numeric import isNumeric, isWithin
 
 def findItem(items: Iterable, condition):
     """Returns the first item in the list of states satisfying the condition."""
@@ -45,6 +45,28 @@ class twoList(UserList):
         return None
 
 
+class LRUCache(OrderedDict):
+    """Dictionary holding at most maxsize items. Items are ordered by their last use - once maxsize is exceeded, the least recently used item is dropped."""
+
+    def __init__(self, maxsize: int = 4096):
+        super(LRUCache, self).__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+        value = super(LRUCache, self).__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+        super(LRUCache, self).__setitem__(key, value)
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            del self[next(iter(self))]  # not popitem, which looks the item up through __getitem__ after removing it
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+
 class LinearEquation:
 
     def __init__(self, LHS: List, RHS: float):
@@ -56,9 +78,12 @@ class LinearEquation:
 
         self.LHS = []
         self.RHS = RHS
+        self._magnitude = abs(RHS)  # sum of magnitudes of the known terms, as a scale to check the remaining RHS against once all terms are known
 
         self._one = 1
 
+        self._unknowns = None  # unknowns of the terms on the LHS, gathered on first use after the LHS changes
+
         self.organizeTerms_fromOriginal()
 
     def organizeTerms_fromOriginal(self):
@@ -136,6 +161,7 @@ class LinearEquation:
             else:
                 # term does not have an unknown, e.g. term is in form "6"
                 self.RHS -= constantFactor  # move constant term to the RHS
+                self._magnitude += abs(constantFactor)
 
         self._gatherUnknowns()
 
@@ -171,6 +197,9 @@ class LinearEquation:
         for termIndex in reversed(sorted(terms_toPop)):  # reversed, sorted list - to make sure indices remain valid as items are removed
             self.LHS.pop(termIndex)
 
+        # LHS terms are finalized here, both after organizing the original terms and after updates - gather unknowns again when next needed
+        self._unknowns = None
+
     def update(self):
         """Iterates over the unknown items in each term, checks if they have become numeric, i.e. have a value now whereas they previously didn't. If so, updates the constant factor
         by multiplying it with the newly determined value and removes it from the unknowns."""
@@ -200,6 +229,7 @@ class LinearEquation:
             if self.LHS[termIndex][1] == []:
                 # if term has no unknowns, it is a constant, move to RHS
                 self.RHS -= self.LHS[termIndex][0]
+                self._magnitude += abs(self.LHS[termIndex][0])
                 self.LHS.pop(termIndex)
 
         for termIndex in reversed(terms_toRemove):  # reversed - otherwise would tamper with indices of items identified for removal
@@ -208,11 +238,23 @@ class LinearEquation:
         self._gatherUnknowns()
 
     def get_unknowns(self) -> list:
-        unknowns = []
-        for [term_constantFactor, term_unknowns_attributeAddresses] in self.LHS:
-            assert len(term_unknowns_attributeAddresses) > 0
-            unknowns.append(term_unknowns_attributeAddresses)
-        return unknowns
+        """Returns a new list of the lists of multiplied unknowns in each LHS term. The unknowns are gathered once per change of the LHS - the inner lists are the terms' own, not to be modified."""
+        if self._unknowns is None:
+            unknowns = []
+            for [term_constantFactor, term_unknowns_attributeAddresses] in self.LHS:
+                assert len(term_unknowns_attributeAddresses) > 0
+                unknowns.append(term_unknowns_attributeAddresses)
+            self._unknowns = unknowns
+        return list(self._unknowns)
+
+    def get_unknownAddresses(self) -> Set:
+        """Returns the set of addresses of the unknowns in the equation, i.e. the multiplied unknowns of all terms together."""
+        return set(unknown for termUnknowns in self.get_unknowns() for unknown in termUnknowns)
+
+    def isSatisfied(self, percentDifference: float = 3) -> bool:
+        """For equations without unknowns left, returns whether the known terms satisfy the equation, i.e. whether the remaining RHS is within percentDifference of the magnitude of the terms."""
+        assert not self.get_unknowns()
+        return isWithin(self.RHS, percentDifference * (10**(-2)) * self._magnitude, 'units', 0)
 
     def isolate(self, unknowns: List) -> List:
         """Isolates the provided unknown term in the equation and returns the expression equivalent to the term."""
@@ -335,54 +377,100 @@ class System_ofLinearEquations:
 
 def updateEquations(equations: List, updatedUnknowns: Set, updateAll: bool = False):
     """Updates the LinearEquations in the list equations if equation contains an unknown from the list updatedUnknowns. Updated all equations if updateAll."""
+    if not updateAll and not updatedUnknowns:
+        return
+
+    updatedUnknowns = set(updatedUnknowns)
     for equation in equations:
-        if updateAll or any(unknown in equation.get_unknowns() for unknown in updatedUnknowns):
+        if updateAll or not updatedUnknowns.isdisjoint(equation.get_unknownAddresses()):
             equation.update()
-        updatedUnknowns = set()
 
 
 def solve_solvableEquations(equations: List):
-    """Solves the solvable LinearEquations in **equations** and returns the newly solved unknowns in the **updatedUnknowns** set."""
+    """Solves the solvable LinearEquations in **equations** and returns the newly solved unknowns in the **updatedUnknowns** set.
+    Equations without any unknowns left, i.e. relations between known values only, are also removed from **equations** as they cannot help find any unknowns - after checking that the known values satisfy them."""
     solvedEquations = []
     updatedUnknowns = set()
 
     for equation in equations:
         equation.update()
-        if equation.isSolvable():
+        if not equation.get_unknowns():
+            if not equation.isSatisfied():
+                # Known values do not satisfy the relation, e.g. an inconsistent cycle specification - report it, the equation still cannot help find any unknowns
+                print('solve_solvableEquations: Known values do not satisfy equation from {0} - remaining RHS: {1}'.format(equation.source, equation.RHS))
+            solvedEquations.append(equation)
+        elif equation.isSolvable():
             solution = equation.solve()
             unknownAddress = list(solution.keys())[0]
             setattr_fromAddress(object=unknownAddress[0], attributeName=unknownAddress[1], value=solution[unknownAddress])
             updatedUnknowns.add(unknownAddress)
             solvedEquations.append(equation)
 
-    for equation in solvedEquations:
-        equations.remove(equation)
+    # Remove solved equations from the pool in one pass - equations compare by identity
+    solvedEquations = set(solvedEquations)
+    equations[:] = [equation for equation in equations if equation not in solvedEquations]
 
     return updatedUnknowns
 
 
+def get_equationGroups(equations: List) -> List[List]:
+    """Splits the LinearEquations into groups such that equations in different groups do not share any unknowns. Equations keep their order in equations within each group.
+    Equations from different groups cannot be solved together as a system, so combinations of equations can be searched for within each group only."""
+    groups = []  # list of [unknownsSet, equationIndices] pairs
+
+    for equationIndex, equation in enumerate(equations):
+        equation_unknowns = equation.get_unknownAddresses()
+        group_unknowns, group_equationIndices = equation_unknowns, [equationIndex]
+
+        # Merge all groups sharing an unknown with this equation into the group of this equation
+        otherGroups = []
+        for otherGroup_unknowns, otherGroup_equationIndices in groups:
+            if group_unknowns.isdisjoint(otherGroup_unknowns):
+                otherGroups.append([otherGroup_unknowns, otherGroup_equationIndices])
+            else:
+                group_unknowns |= otherGroup_unknowns
+                group_equationIndices += otherGroup_equationIndices
+        groups = otherGroups + [[group_unknowns, group_equationIndices]]
+
+    return [[equations[equationIndex] for equationIndex in sorted(group_equationIndices)] for _, group_equationIndices in groups]
+
+
 def solve_combination_ofEquations(equations: List, number_ofEquations: int) -> Set:
     """Iterates through combinations of equations (from the equations pool) with the specified number_ofEquations. For each combination, checks if the
-    system is solvable. If so, solves it, assigns the unknowns the solution values and removes the solved equations from the _equations pool."""
+    system is solvable. If so, solves it, assigns the unknowns the solution values and removes the solved equations from the _equations pool.
+    Only combinations of equations sharing unknowns (i.e. from the same group, see get_equationGroups) are checked - others cannot form a solvable system."""
     updatedUnknowns = set()
+    solvedEquations = set()
+
+    if len(equations) < number_ofEquations:
+        return updatedUnknowns
+
+    # A solvable system has as many unknowns as equations - used to skip combinations before constructing the system
+    equation_unknownAddresses = {equation: equation.get_unknownAddresses() for equation in equations}
+
+    for equationGroup in get_equationGroups(equations):
+        for equationCombination in combinations(equationGroup, number_ofEquations):
+
+            # If any of the equations got solved in a previous iteration, skip this combination
+            # Combinations are generated beforehand at the beginning of the main for loop.
+            if any(equation in solvedEquations for equation in equationCombination):
+                continue
 
-    for equationCombination in combinations(equations, number_ofEquations):
+            if len(set().union(*(equation_unknownAddresses[equation] for equation in equationCombination))) != number_ofEquations:
+                continue
 
-        # If any of the equations got solved in a previous iteration and got removed from _equations, skip this combination
-        # Combinations are generated beforehand at the beginning of the main for loop.
-        if any(equation not in equations for equation in equationCombination):
-            continue
+            if (system := System_ofLinearEquations(list(equationCombination))).isSolvable():
+                solution = system.solve()
+                unknownAddresses = list(solution.keys())
+                for unknownAddress in unknownAddresses:
+                    setattr_fromAddress(object=unknownAddress[0], attributeName=unknownAddress[1], value=solution[unknownAddress])
+                    updatedUnknowns.add(unknownAddress)
 
-        if (system := System_ofLinearEquations(list(equationCombination))).isSolvable():
-            solution = system.solve()
-            unknownAddresses = list(solution.keys())
-            for unknownAddress in unknownAddresses:
-                setattr_fromAddress(object=unknownAddress[0], attributeName=unknownAddress[1], value=solution[unknownAddress])
-                updatedUnknowns.add(unknownAddress)
+                # If system is solved, all equations in the combination is solved.
+                solvedEquations.update(equationCombination)
 
-            # If system is solved, all equations in the combination is solved. Remove them from equations pool.
-            for equation in equationCombination:
-                equations.remove(equation)
+    # Remove solved equations from the equations pool in one pass
+    equations[:] = [equation for equation in equations if equation not in solvedEquations]
 
     return updatedUnknowns
 